@@ -2,7 +2,6 @@
 Market Snapshots Capture Module
 Captures IBKR position data and writes to database every 30 minutes
 """
-import time
 import threading
 import pandas as pd
 import random
@@ -45,10 +44,14 @@ class IBKRPositionApp(EWrapper, EClient):
         self.positions = {}
         self.market_data = {}
         self.req_id = 1000
-        self.position_data_received = False
         self.market_data_requests = {}
         self.account_updates = {}
-        self.account_update_complete = False
+        # Set from positionEnd/accountDownloadEnd so the waits below wake as
+        # soon as IBKR finishes instead of on the next poll
+        self.position_data_received = threading.Event()
+        self.account_update_complete = threading.Event()
+        # Set by nextValidId once the connection handshake has completed
+        self.connected_event = threading.Event()
 
     def connectTWS(self, host='127.0.0.1', port=4002):
         """Connect to TWS or IB Gateway"""
@@ -59,7 +62,7 @@ class IBKRPositionApp(EWrapper, EClient):
             thread = threading.Thread(target=self.run)
             thread.daemon = True
             thread.start()
-            time.sleep(2)
+            self.connected_event.wait(timeout=10)
 
             if self.isConnected():
                 logger.info(f"Connected to TWS/Gateway on {host}:{port}")
@@ -69,6 +72,11 @@ class IBKRPositionApp(EWrapper, EClient):
             logger.error(f"Connection error: {e}")
             return False
 
+    def nextValidId(self, orderId):
+        """Callback when the connection is ready for requests"""
+        super().nextValidId(orderId)
+        self.connected_event.set()
+
     def position(self, account, contract, position, avgCost):
         """Callback for position data"""
         key = f"{contract.symbol}_{contract.secType}_{contract.strike}_{contract.right}_{contract.lastTradeDateOrContractMonth}"
@@ -97,7 +105,7 @@ class IBKRPositionApp(EWrapper, EClient):
 
     def positionEnd(self):
         """Callback when all positions have been received"""
-        self.position_data_received = True
+        self.position_data_received.set()
         logger.info("All position data received")
 
     def updateAccountValue(self, key, val, currency, accountName):
@@ -122,7 +130,7 @@ class IBKRPositionApp(EWrapper, EClient):
 
     def accountDownloadEnd(self, accountName):
         """Callback when account download is complete"""
-        self.account_update_complete = True
+        self.account_update_complete.set()
         logger.info(f"Account download complete for {accountName}")
 
     def error(self, reqId, errorCode, errorString):
@@ -135,10 +143,7 @@ class IBKRPositionApp(EWrapper, EClient):
         """Request positions and wait for data"""
         self.reqPositions()
         timeout = 30
-        start_time = time.time()
-
-        while not self.position_data_received and (time.time() - start_time) < timeout:
-            time.sleep(0.1)
+        self.position_data_received.wait(timeout)
 
         return len(self.positions)
 
@@ -149,9 +154,7 @@ class IBKRPositionApp(EWrapper, EClient):
 
         # Wait for account updates
         timeout = 10
-        start_time = time.time()
-        while not self.account_update_complete and (time.time() - start_time) < timeout:
-            time.sleep(0.1)
+        self.account_update_complete.wait(timeout)
 
         # Stop account updates
         self.reqAccountUpdates(False, account_id)
@@ -296,9 +299,10 @@ def join_spreads_with_database(spreads_df, db_strategies_df):
     joined_data = []
     unmatched_spreads = []
 
-    for _, ibkr_row in spreads_df.iterrows():
-        description = ibkr_row['Description']
-        symbol = ibkr_row['Symbol']
+    # itertuples yields plain namedtuples instead of building a Series per row
+    for ibkr_row in spreads_df.itertuples(index=False):
+        description = ibkr_row.Description
+        symbol = ibkr_row.Symbol
 
         parts = description.split()
         strategy_type = ' '.join(parts[:2])
@@ -328,21 +332,21 @@ def join_spreads_with_database(spreads_df, db_strategies_df):
         if matches.empty:
             unmatched_spreads.append(f"{symbol} {description}")
 
-        for _, db_row in matches.iterrows():
+        for db_row in matches.itertuples(index=False):
             joined_data.append({
                 'ibkr_symbol': symbol,
                 'ibkr_description': description,
-                'ibkr_avg_cost': ibkr_row['AvgCost'],
-                'ibkr_current_price': ibkr_row['CurrentPrice'],
-                'ibkr_unrealized_pnl': ibkr_row['UnrealizedPnL'],
-                'ibkr_market_val': ibkr_row['MarketVal'],
-                'ibkr_position': ibkr_row['Position'],
-                'db_id': db_row['id'],
-                'db_ticker': db_row['ticker'],
-                'db_strategy_type': db_row['strategy_type'],
-                'db_estimated_premium': db_row['estimated_premium'],
-                'db_trade_id': db_row['trade_id'],
-                'premium_difference': ibkr_row['AvgCost'] - db_row['estimated_premium']
+                'ibkr_avg_cost': ibkr_row.AvgCost,
+                'ibkr_current_price': ibkr_row.CurrentPrice,
+                'ibkr_unrealized_pnl': ibkr_row.UnrealizedPnL,
+                'ibkr_market_val': ibkr_row.MarketVal,
+                'ibkr_position': ibkr_row.Position,
+                'db_id': db_row.id,
+                'db_ticker': db_row.ticker,
+                'db_strategy_type': db_row.strategy_type,
+                'db_estimated_premium': db_row.estimated_premium,
+                'db_trade_id': db_row.trade_id,
+                'premium_difference': ibkr_row.AvgCost - db_row.estimated_premium
             })
 
     # Log unmatched spreads
@@ -368,7 +372,7 @@ def insert_positions_to_database(joined_df, pg_creds):
 
         cursor = conn.cursor()
 
-        for _, row in joined_df.iterrows():
+        for row in joined_df.itertuples(index=False):
             insert_sql = """
             INSERT INTO ibkr_positions (
                 ibkr_symbol, ibkr_description, ibkr_avg_cost, ibkr_current_price,
@@ -385,19 +389,19 @@ def insert_positions_to_database(joined_df, pg_creds):
             """
 
             cursor.execute(insert_sql, (
-                row['ibkr_symbol'],
-                row['ibkr_description'],
-                row['ibkr_avg_cost'],
-                row['ibkr_current_price'],
-                row['ibkr_unrealized_pnl'],
-                row['ibkr_market_val'],
-                row['ibkr_position'],
-                row['db_id'],
-                row['db_ticker'],
-                row['db_strategy_type'],
-                row['db_estimated_premium'],
-                row['db_trade_id'],
-                row['premium_difference']
+                row.ibkr_symbol,
+                row.ibkr_description,
+                row.ibkr_avg_cost,
+                row.ibkr_current_price,
+                row.ibkr_unrealized_pnl,
+                row.ibkr_market_val,
+                row.ibkr_position,
+                row.db_id,
+                row.db_ticker,
+                row.db_strategy_type,
+                row.db_estimated_premium,
+                row.db_trade_id,
+                row.premium_difference
             ))
 
         conn.commit()
@@ -9,6 +9,7 @@ import logging
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Tuple, Optional
 import threading
+import queue
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -38,7 +39,24 @@ class ContractValidationWrapper(EWrapper):
         self.contract_details = {}
         self.validation_results = {}
         self.errors = {}
-        self.pending_requests = set()
+        # Per-request completion queues; callbacks put the validation result
+        # and the waiting thread wakes on it directly instead of polling
+        self.completions: Dict[int, queue.SimpleQueue] = {}
+        # Set by nextValidId once the connection handshake has completed
+        self.connected_event = threading.Event()
+
+    @iswrapper
+    def nextValidId(self, orderId: int):
+        """Handle the start of the API session"""
+        super().nextValidId(orderId)
+        self.connected_event.set()
+
+    def _complete(self, reqId: int, result: Dict):
+        """Record a validation result and wake the thread waiting on it"""
+        self.validation_results[reqId] = result
+        completion = self.completions.get(reqId)
+        if completion is not None:
+            completion.put(result)
 
     @iswrapper
     def contractDetails(self, reqId: int, contractDetails):
@@ -60,14 +78,10 @@ class ContractValidationWrapper(EWrapper):
         """Handle end of contract details for a request"""
         if reqId not in self.contract_details:
             # No contract details received means contract doesn't exist
-            self.validation_results[reqId] = {'valid': False, 'reason': 'No contract found'}
             logger.warning(f"❌ No contract found for req_id {reqId}")
+            self._complete(reqId, {'valid': False, 'reason': 'No contract found'})
         else:
-            self.validation_results[reqId] = {'valid': True}
-
-        # Remove from pending requests
-        if reqId in self.pending_requests:
-            self.pending_requests.remove(reqId)
+            self._complete(reqId, {'valid': True})
 
     @iswrapper
     def error(self, reqId: int, errorCode: int, errorString: str, advancedOrderRejectJson=""):
@@ -83,15 +97,11 @@ class ContractValidationWrapper(EWrapper):
 
         # Mark as invalid if it's a real error about the contract
         if errorCode in [200, 354]:  # Contract not found errors
-            self.validation_results[reqId] = {
+            logger.warning(f"❌ Contract validation error for req_id {reqId}: {errorCode} - {errorString}")
+            self._complete(reqId, {
                 'valid': False,
                 'reason': f'Error {errorCode}: {errorString}'
-            }
-            logger.warning(f"❌ Contract validation error for req_id {reqId}: {errorCode} - {errorString}")
-
-            # Remove from pending requests
-            if reqId in self.pending_requests:
-                self.pending_requests.remove(reqId)
+            })
         else:
             logger.info(f"API message for req_id {reqId}: {errorCode} - {errorString}")
 
@@ -126,8 +136,8 @@ class OptionsContractValidator:
             api_thread = threading.Thread(target=self.app.run, daemon=True)
             api_thread.start()
 
-            # Wait for connection
-            time.sleep(3)
+            # Wait for the connection handshake rather than a fixed delay
+            self.app.connected_event.wait(timeout=10)
 
             if self.app.isConnected():
                 logger.info("✅ Connected to IB Gateway")
@@ -165,24 +175,20 @@ class OptionsContractValidator:
         self.next_req_id += 1
 
         contract = self.create_option_contract(ticker, expiry_date, strike, right)
-        self.app.pending_requests.add(req_id)
+        completion = self.app.completions[req_id] = queue.SimpleQueue()
 
         logger.info(f"Validating contract: {ticker} {expiry_date} {strike} {right} (req_id: {req_id})")
         self.app.reqContractDetails(req_id, contract)
 
         # Wait for response with timeout
         timeout = 10  # 10 seconds timeout
-        start_time = time.time()
-
-        while req_id in self.app.pending_requests and (time.time() - start_time) < timeout:
-            time.sleep(0.1)
-
-        # Check result
-        if req_id in self.app.validation_results:
-            return self.app.validation_results[req_id]['valid']
-        else:
+        try:
+            return completion.get(timeout=timeout)['valid']
+        except queue.Empty:
             logger.warning(f"⏰ Timeout validating contract: {ticker} {expiry_date} {strike} {right}")
             return False
+        finally:
+            self.app.completions.pop(req_id, None)
 
     def validate_spread_contracts(self, ticker: str, expiry_date: str, buy_strike: float, sell_strike: float) -> Tuple[bool, bool]:
         """Validate both legs of an options spread"""
@@ -229,19 +235,21 @@ class OptionsContractValidator:
 
     def get_todays_trade_ideas(self, cursor) -> List[Dict]:
         """Get all trade ideas scraped today"""
-        today = date.today().strftime('%Y-%m-%d')
+        today = date.today()
 
+        # Half-open [today, tomorrow) range keeps the predicate on the bare
+        # column so the scrape_date index can be used
         query = """
         SELECT id, ticker, strike_buy, strike_sell, options_expiry_date, options_expiry_date_as_scrapped
         FROM option_strategies
-        WHERE DATE(scrape_date) = %s
+        WHERE scrape_date >= %s AND scrape_date < %s
         AND options_expiry_date IS NOT NULL
         AND ticker IS NOT NULL
         AND strike_buy IS NOT NULL
         AND strike_sell IS NOT NULL
         """
 
-        cursor.execute(query, (today,))
+        cursor.execute(query, (today, today + timedelta(days=1)))
         results = cursor.fetchall()
 
         trade_ideas = []
@@ -292,17 +292,17 @@ def generate_trade_id(scrape_date: str, strategy_type: str, tab_name: str, ticke
         str: Human-readable trade ID
     """
     components = [
-        str(scrape_date) if scrape_date is not None else '',
-        str(strategy_type) if strategy_type is not None else '',
-        str(tab_name) if tab_name is not None else '',
-        str(ticker) if ticker is not None else '',
-        str(trigger_price) if trigger_price is not None else '',
-        str(strike_price) if strike_price is not None else ''
+        str(scrape_date).encode('utf-8') if scrape_date is not None else b'',
+        str(strategy_type).encode('utf-8') if strategy_type is not None else b'',
+        str(tab_name).encode('utf-8') if tab_name is not None else b'',
+        str(ticker).encode('utf-8') if ticker is not None else b'',
+        str(trigger_price).encode('utf-8') if trigger_price is not None else b'',
+        str(strike_price).encode('utf-8') if strike_price is not None else b''
     ]
     
-    combined_string = '|'.join(components)
-    hash_value = hashlib.sha256(combined_string.encode('utf-8')).hexdigest()
-    hash_seed = int(hash_value[:8], 16)
+    combined_bytes = b'|'.join(components)
+    digest = hashlib.sha256(combined_bytes).digest()
+    hash_seed = int.from_bytes(digest[:4], 'big')  # same value as int(hexdigest()[:8], 16)
     
     random.seed(hash_seed)
     trade_id = '-'.join(coolname.generate(3))
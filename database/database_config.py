@@ -5,10 +5,12 @@ Supports both SQLite (for development/fallback) and PostgreSQL (production)
 
 import os
 import sqlite3
-import psycopg2
+from psycopg2 import InterfaceError, OperationalError
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 import pandas as pd
 import logging
 import sys
+import threading
 from contextlib import contextmanager
 from typing import Optional, Union, Dict, Any
 
@@ -23,14 +25,45 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Applied to long-lived SQLite connections (get_connection(long_lived=True));
+# one-shot query connections skip them. journal_mode=WAL persists in the file.
+SQLITE_PRAGMAS = (
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    'temp_store=MEMORY',
+    'cache_size=-65536',     # 64 MiB page cache (negative values are KiB)
+    'mmap_size=268435456',   # read pages through a 256 MiB memory map
+)
+
+# PostgreSQL connections kept open per DatabaseConnection and reused across calls
+PG_POOL_MIN_CONNECTIONS = 1
+PG_POOL_MAX_CONNECTIONS = 16
+# Seconds to wait for a pooled connection once all of them are checked out
+PG_POOL_WAIT_TIMEOUT = 30
+# TCP keepalives for pooled connections, so a peer that has gone away is
+# noticed while the connection sits idle in the pool
+PG_KEEPALIVE_SETTINGS = {
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 3,
+}
+
 class DatabaseConfig:
     """Database configuration management with secure credentials"""
     
-    def __init__(self):
-        self.db_type = os.getenv('DB_TYPE', 'postgresql').lower()
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        """
+        Parameters:
+            params: explicit settings from from_params(); when omitted they come
+                from the credentials file or environment variables
+        """
+        self.db_type = ((params or {}).get('db_type') or os.getenv('DB_TYPE', 'postgresql')).lower()
         
+        if params is not None:
+            self._load_from_params(params)
         # Try to load from credentials file first, then fall back to environment variables
-        if CREDENTIALS_AVAILABLE:
+        elif CREDENTIALS_AVAILABLE:
             try:
                 credentials_loader = get_credentials_loader()
                 # Set environment variables from credentials if not already set
@@ -59,6 +92,41 @@ class DatabaseConfig:
             logger.warning("Credentials loader not available. Using environment variables.")
             self._load_from_env()
     
+    @classmethod
+    def from_params(cls, db_type: str = 'postgresql', host: str = 'localhost', port: int = 5432,
+                    database: str = 'option_strategies', user: str = 'optcom-user',
+                    password: Optional[str] = None, sqlite_path: Optional[str] = None) -> 'DatabaseConfig':
+        """
+        Build a configuration from explicit values instead of the credentials
+        file; sqlite_path defaults to SQLITE_DB_PATH as in _load_from_env
+        """
+        return cls({
+            'db_type': db_type,
+            'host': host,
+            'port': port,
+            'database': database,
+            'user': user,
+            'password': password,
+            'sqlite_path': sqlite_path,
+        })
+    
+    def _load_from_params(self, params: Dict[str, Any]):
+        """Load configuration from explicit from_params() values"""
+        self.pg_config = {
+            'host': params['host'],
+            'port': int(params['port']),
+            'database': params['database'],
+            'user': params['user'],
+            'password': params['password']
+        }
+        self.sqlite_path = params['sqlite_path'] or self._default_sqlite_path()
+    
+    @staticmethod
+    def _default_sqlite_path() -> str:
+        """SQLITE_DB_PATH, or option_strategies.db next to this module"""
+        return os.getenv('SQLITE_DB_PATH',
+                         os.path.join(os.path.dirname(__file__), 'option_strategies.db'))
+    
     def _load_from_env(self):
         """Load configuration from environment variables (fallback)"""
         # PostgreSQL configuration
@@ -71,8 +139,7 @@ class DatabaseConfig:
         }
         
         # SQLite configuration (fallback)
-        self.sqlite_path = os.getenv('SQLITE_DB_PATH', 
-                                   os.path.join(os.path.dirname(__file__), 'option_strategies.db'))
+        self.sqlite_path = self._default_sqlite_path()
     
     def get_connection_string(self) -> str:
         """Get connection string for the configured database"""
@@ -91,32 +158,127 @@ class DatabaseConfig:
         """Check if using SQLite"""
         return self.db_type == 'sqlite'
 
+class _SessionPool(ThreadedConnectionPool):
+    """
+    Threaded psycopg2 pool whose getconn waits for a free connection instead
+    of raising when maxconn are checked out
+    """
+    
+    def __init__(self, minconn, maxconn, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, **kwargs)
+    
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=PG_POOL_WAIT_TIMEOUT):
+            raise PoolError(f"no pooled connection free after {PG_POOL_WAIT_TIMEOUT}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
 class DatabaseConnection:
     """Database connection manager with support for both SQLite and PostgreSQL"""
     
     def __init__(self, config: Optional[DatabaseConfig] = None):
         self.config = config or DatabaseConfig()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Create the PostgreSQL connection pool on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = _SessionPool(PG_POOL_MIN_CONNECTIONS, PG_POOL_MAX_CONNECTIONS,
+                                          **self.config.pg_config, **PG_KEEPALIVE_SETTINGS)
+            return self._pool
+    
+    def _checkout(self, pool: ThreadedConnectionPool):
+        """
+        Take a connection from the pool, replacing it once if the server or a
+        proxy dropped it while it sat idle
+        """
+        conn = pool.getconn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            conn.rollback()
+            return conn
+        except (OperationalError, InterfaceError) as e:
+            logger.warning(f"Discarding dead pooled connection: {str(e)}")
+            pool.putconn(conn, close=True)
+            return pool.getconn()
+    
+    def close(self):
+        """Close every pooled PostgreSQL connection"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
         
     @contextmanager
-    def get_connection(self):
-        """Get database connection with automatic cleanup"""
+    def get_connection(self, long_lived: bool = False):
+        """
+        Get database connection with automatic cleanup
+        
+        Parameters:
+            long_lived: the caller keeps the connection for many statements;
+                SQLite connections are then tuned with SQLITE_PRAGMAS and run
+                PRAGMA optimize on close, which one-shot queries skip
+        """
         conn = None
+        pool = None
         try:
             if self.config.is_postgresql():
-                conn = psycopg2.connect(**self.config.pg_config)
+                pool = self._get_pool()
+                conn = self._checkout(pool)
             else:
                 conn = sqlite3.connect(self.config.sqlite_path)
+                if long_lived:
+                    self._apply_sqlite_pragmas(conn)
             
             yield conn
             
         except Exception as e:
-            if conn:
+            # A dead PostgreSQL connection can't roll back; don't let that
+            # error hide the original one
+            if conn and not getattr(conn, 'closed', False):
                 conn.rollback()
             logger.error(f"Database connection error: {str(e)}")
             raise
         finally:
             if conn:
-                conn.close()
+                if pool is not None:
+                    # putconn rolls back any open transaction before reuse
+                    pool.putconn(conn, close=bool(conn.closed))
+                else:
+                    if long_lived:
+                        self._optimize_sqlite(conn)
+                    conn.close()
+    
+    def _optimize_sqlite(self, conn):
+        """
+        Let SQLite refresh statistics for tables whose indexes this connection
+        used heavily; cheap when nothing needs doing
+        """
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning(f"PRAGMA optimize failed: {str(e)}")
+    
+    def _apply_sqlite_pragmas(self, conn):
+        """
+        Tune a new SQLite connection: WAL lets readers proceed during writes,
+        and synchronous=NORMAL under WAL only fsyncs at checkpoints
+        """
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
     
     def get_cursor(self, conn):
         """Get database cursor"""
@@ -182,6 +344,47 @@ class DatabaseConnection:
             logger.error(f"Database connection failed: {str(e)}")
             return False
     
+    def health_check(self, table_name: str = 'option_strategies') -> Optional[tuple]:
+        """
+        Check connectivity, table existence and row count on one connection
+        
+        Returns:
+            (version, table_exists, row_count) or None if the connection fails;
+            row_count is None when the table does not exist
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = self.get_cursor(conn)
+                
+                if self.config.is_postgresql():
+                    cursor.execute("SELECT version();")
+                    version = cursor.fetchone()[0]
+                    cursor.execute(
+                        "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = %s)",
+                        (table_name,)
+                    )
+                    exists = bool(cursor.fetchone()[0])
+                else:
+                    cursor.execute("SELECT sqlite_version();")
+                    version = cursor.fetchone()[0]
+                    cursor.execute(
+                        "SELECT name FROM sqlite_master WHERE type='table' AND name = ?",
+                        (table_name,)
+                    )
+                    exists = cursor.fetchone() is not None
+                
+                row_count = None
+                if exists:
+                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+                    row_count = cursor.fetchone()[0]
+                
+                logger.info(f"Database connection successful: {version}")
+                return version, exists, row_count
+                
+        except Exception as e:
+            logger.error(f"Database health check failed: {str(e)}")
+            return None
+    
     def get_table_info(self, table_name: str = 'option_strategies') -> list:
         """Get table structure information"""
         if self.config.is_postgresql():
@@ -223,9 +426,31 @@ class DatabaseConnection:
 # Global database connection instance
 db_connection = DatabaseConnection()
 
-def get_db_connection():
-    """Get the global database connection instance"""
-    return db_connection
+# Connection managers for explicit configurations, one per distinct config so
+# each PostgreSQL pool is created once and reused
+_config_connections: Dict[tuple, DatabaseConnection] = {}
+_config_connections_lock = threading.Lock()
+
+def _config_key(config: DatabaseConfig) -> tuple:
+    """Hashable identity of a configuration's connection settings"""
+    # Configs loaded from the credentials file only carry settings for their own database type
+    pg_config = getattr(config, 'pg_config', None) or {}
+    return (config.db_type, tuple(sorted(pg_config.items())),
+            getattr(config, 'sqlite_path', None))
+
+def get_db_connection(config: Optional[DatabaseConfig] = None) -> DatabaseConnection:
+    """
+    Get the global database connection instance, or the shared connection
+    manager for an explicit configuration
+    """
+    if config is None:
+        return db_connection
+    key = _config_key(config)
+    with _config_connections_lock:
+        conn_manager = _config_connections.get(key)
+        if conn_manager is None:
+            conn_manager = _config_connections[key] = DatabaseConnection(config)
+        return conn_manager
 
 def setup_database(db_path: Optional[str] = None) -> bool:
     """
@@ -37,20 +37,20 @@ def generate_trade_id(scrape_date, strategy_type, tab_name, ticker, trigger_pric
     """
     # Convert all inputs to strings and handle None values
     components = [
-        str(scrape_date) if scrape_date is not None else '',
-        str(strategy_type) if strategy_type is not None else '',
-        str(tab_name) if tab_name is not None else '',
-        str(ticker) if ticker is not None else '',
-        str(trigger_price) if trigger_price is not None else '',
-        str(strike_price) if strike_price is not None else ''
+        str(scrape_date).encode('utf-8') if scrape_date is not None else b'',
+        str(strategy_type).encode('utf-8') if strategy_type is not None else b'',
+        str(tab_name).encode('utf-8') if tab_name is not None else b'',
+        str(ticker).encode('utf-8') if ticker is not None else b'',
+        str(trigger_price).encode('utf-8') if trigger_price is not None else b'',
+        str(strike_price).encode('utf-8') if strike_price is not None else b''
     ]
     
     # Join components with delimiter
-    combined_string = '|'.join(components)
+    combined_bytes = b'|'.join(components)
     
     # Generate hash and use as seed for reproducible results
-    hash_value = hashlib.sha256(combined_string.encode('utf-8')).hexdigest()
-    hash_seed = int(hash_value[:8], 16)
+    digest = hashlib.sha256(combined_bytes).digest()
+    hash_seed = int.from_bytes(digest[:4], 'big')  # same value as int(hexdigest()[:8], 16)
     
     # Set random seed for deterministic results
     random.seed(hash_seed)
@@ -167,22 +167,13 @@ def populate_existing_trade_ids():
         
         logger.info(f"Generated {len(updates)} trade_ids ({duplicates} duplicates resolved)")
         
-        # Update records in batches
-        batch_size = 100
-        total_updated = 0
+        # Update all records in one executemany: a single connection and one
+        # commit, rather than a connect + commit per batch
+        update_query = "UPDATE option_strategies SET trade_id = %s WHERE id = %s"
+        if db_conn.config.is_sqlite():
+            update_query = "UPDATE option_strategies SET trade_id = ? WHERE id = ?"
         
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i + batch_size]
-            
-            # Prepare batch update
-            update_query = "UPDATE option_strategies SET trade_id = %s WHERE id = %s"
-            if db_conn.config.is_sqlite():
-                update_query = "UPDATE option_strategies SET trade_id = ? WHERE id = ?"
-            
-            updated_count = db_conn.execute_many(update_query, batch)
-            total_updated += updated_count
-            
-            logger.info(f"Updated batch {i//batch_size + 1}: {updated_count} records")
+        total_updated = db_conn.execute_many(update_query, updates)
         
         logger.info(f"Successfully updated {total_updated} records with trade_ids")
         
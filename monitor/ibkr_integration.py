@@ -111,6 +111,13 @@ class IBAPIWrapper(EWrapper):
             self.data_queue.put(("market_data", (ticker, price, tickType)))
             logger.debug(f"Received price for {ticker}: ${price} (type: {tickType})")
     
+    def tickSnapshotEnd(self, reqId: int):
+        """
+        Callback when a market data snapshot is complete
+        """
+        super().tickSnapshotEnd(reqId)
+        self.data_queue.put(("snapshot_end", reqId))
+    
     def getNextRequestId(self):
         """
         Get the next available request ID
@@ -436,16 +443,18 @@ class IBKRDataProvider:
             del self.wrapper.market_data[req_id]
         
         try:
-            # Request market data
-            self.client.reqMktData(req_id, contract, "", False, False, [])
+            # Request a one-shot snapshot; IBKR ends it with tickSnapshotEnd and
+            # frees the market data line itself
+            self.client.reqMktData(req_id, contract, "", True, False, [])
             
             # Wait for price data - increased timeout for better reliability
             timeout = 12  # seconds - increased from 3 to handle delays
             start_time = time.time()
             
             received_data = False
+            snapshot_done = False
             
-            while time.time() - start_time < timeout and not received_data:
+            while time.time() - start_time < timeout and not received_data and not snapshot_done:
                 try:
                     msg_type, msg_data = self.wrapper.data_queue.get(timeout=0.5)
                     
@@ -462,6 +471,11 @@ class IBKRDataProvider:
                         if tick_type == 4:  # If we get a last price, we're done
                             received_data = True
                     
+                    elif msg_type == "snapshot_end" and msg_data == req_id:
+                        # Everything available has been sent, e.g. no last trade yet
+                        snapshot_done = True
+                        break
+                    
                     elif msg_type == "error" and msg_data[0] == req_id:
                         # Error receiving market data
                         error_code = msg_data[1]
@@ -473,12 +487,14 @@ class IBKRDataProvider:
                 except Exception as e:
                     logger.error(f"Error processing market data: {str(e)}")
             
-            # Cancel market data to avoid hitting limits
-            try:
-                self.client.cancelMktData(req_id)
-            except:
-                # If we're already disconnected, this will fail
-                pass
+            # Cancel market data to avoid hitting limits, unless the snapshot
+            # has already finished
+            if not snapshot_done:
+                try:
+                    self.client.cancelMktData(req_id)
+                except:
+                    # If we're already disconnected, this will fail
+                    pass
             
             # Check if we have market data
             if req_id in self.wrapper.market_data:
@@ -401,8 +401,11 @@ def monitor_prices(ibkr_host='127.0.0.1', ibkr_port=4002, check_interval=60, max
             already_triggered = {row[0] for row in results}
             logger.info(f"Found {len(already_triggered)} strategies that are already triggered")
         
-        # Track start time if max_runtime is specified
-        start_time = time.time()
+        # Track start time if max_runtime is specified (monotonic so wall-clock
+        # adjustments don't affect the runtime guard or tick cadence)
+        start_time = time.monotonic()
+        next_deadline = start_time
+        missed_ticks = 0
         
         # Main monitoring loop
         try:
@@ -411,7 +414,7 @@ def monitor_prices(ibkr_host='127.0.0.1', ibkr_port=4002, check_interval=60, max
                 logger.info(f"===== Price Check at {current_time} =====")
                 
                 # Check if we've exceeded max runtime
-                if max_runtime and (time.time() - start_time > max_runtime):
+                if max_runtime and (time.monotonic() - start_time > max_runtime):
                     logger.info(f"Reached maximum runtime of {max_runtime} seconds")
                     break
                 
@@ -450,11 +453,13 @@ def monitor_prices(ibkr_host='127.0.0.1', ibkr_port=4002, check_interval=60, max
                 # Reset triggered column but keep price_when_triggered if not changed
                 strategies_df['triggered'] = None
                 
-                # Compare prices to triggers and record current prices
-                for idx, row in strategies_df.iterrows():
-                    ticker = row['ticker']
-                    strategy_type = row['strategy_type']
-                    strategy_id = row['id']
+                # Compare prices to triggers and record current prices. itertuples
+                # avoids building a Series per row; the index is zipped in for .at writes
+                _isna = pd.isna
+                for idx, row in zip(strategies_df.index, strategies_df.itertuples(index=False)):
+                    ticker = row.ticker
+                    strategy_type = row.strategy_type
+                    strategy_id = row.id
                     
                     if ticker not in last_prices:
                         logger.debug(f"No price available for {ticker}, skipping strategy ID {strategy_id}")
@@ -463,7 +468,7 @@ def monitor_prices(ibkr_host='127.0.0.1', ibkr_port=4002, check_interval=60, max
                     current_price = last_prices[ticker]
                     
                     # Skip if price is None or NaN
-                    if current_price is None or pd.isna(current_price):
+                    if current_price is None or _isna(current_price):
                         logger.warning(f"Skipping strategy ID {strategy_id} for {ticker} - invalid price: {current_price}")
                         continue
                     
@@ -475,11 +480,11 @@ def monitor_prices(ibkr_host='127.0.0.1', ibkr_port=4002, check_interval=60, max
                         logger.debug(f"Skipping strategy ID {strategy_id} as it's already triggered")
                         continue
                     
-                    if pd.isna(row['trigger_price_value']):
+                    trigger_price = row.trigger_price_value
+                    if _isna(trigger_price):
                         continue
                         
                     price_when_triggered = current_price
-                    trigger_price = row['trigger_price_value']
                     
                     # Record the current price in memory
                     strategies_df.at[idx, 'price_when_triggered'] = price_when_triggered
@@ -512,9 +517,20 @@ def monitor_prices(ibkr_host='127.0.0.1', ibkr_port=4002, check_interval=60, max
                 # strategies_df.to_csv(latest_path, index=False)
                 # logger.info(f"Updated latest status file at {latest_path}")
                 
-                # Wait for next check
-                logger.info(f"Waiting {check_interval} seconds until next check...")
-                time.sleep(check_interval)
+                # Wait for next check, sleeping only until the next absolute deadline
+                # so time spent inside the tick doesn't stretch the period
+                next_deadline += check_interval
+                sleep_for = max(0, next_deadline - time.monotonic())
+                if sleep_for == 0:
+                    missed_ticks += 1
+                    logger.warning(f"Price check overran the {check_interval}s interval "
+                                   f"({missed_ticks} consecutive missed ticks)")
+                    # Re-anchor so a long overrun doesn't cause a burst of catch-up ticks
+                    next_deadline = time.monotonic()
+                else:
+                    missed_ticks = 0
+                    logger.info(f"Waiting {sleep_for:.1f} seconds until next check...")
+                time.sleep(sleep_for)
                 
         except KeyboardInterrupt:
             logger.info("Monitoring stopped by user")
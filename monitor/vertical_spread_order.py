@@ -2,7 +2,11 @@
 # IBKR Market Order Script for Option Spreads - No Take Profit
 
 import pandas as pd
+import numpy as np
 import datetime
+from collections import defaultdict
+import itertools
+import json
 from ibapi.client import EClient
 from ibapi.wrapper import EWrapper
 from ibapi.contract import Contract, ComboLeg
@@ -11,8 +15,10 @@ from ibapi.utils import iswrapper
 import time
 import threading
 import logging
+import logging.handlers
+import queue
+import atexit
 import os
-import random
 import argparse
 import sys
 
@@ -24,46 +30,117 @@ from database_config import get_db_connection
 log_dir = os.path.join(os.path.dirname(__file__), 'output', 'logs')
 os.makedirs(log_dir, exist_ok=True)
 
-# Set up logging
+# Set up logging. File writes go through a queue to a background listener
+# thread so the IBKR reader thread never blocks on disk I/O.
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue, logging.FileHandler(os.path.join(log_dir, "vertical_spread_order.log")))
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(os.path.join(log_dir, "vertical_spread_order.log")),
+        logging.handlers.QueueHandler(log_queue),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# How long to wait for IBKR responses, in seconds
+DETAILS_WAIT_TIME = 8
+PRICE_WAIT_TIME = 8
+ORDER_WAIT_TIME = 3
+
+# IBKR errors after which a market data request will not deliver anything
+PRICE_REQUEST_ERRORS = (200, 354)
+
+# Upper bound on requests kept in flight at once, to stay inside IBKR's
+# market data line allowance. This does not limit the send rate; see
+# MAX_MESSAGES_PER_SECOND
+MAX_CONCURRENT_REQUESTS = 50
+
+# IBKR answers more than 50 client messages per second with error 100 and
+# throttling, so every request, cancel and order is spaced to stay below that
+MAX_MESSAGES_PER_SECOND = 45
+
+# Resolved contract details are cached per trading day under this directory
+contract_cache_dir = os.path.join(os.path.dirname(__file__), 'output', 'contract_cache')
+
+# Option right traded for each supported strategy type. Both spreads are
+# entered by buying the combo at a negative (credit) limit price.
+STRATEGY_RIGHTS = {'Bear Call': 'C', 'Bull Put': 'P'}
+
+# Columns process_strategies reads; selecting only these keeps the DataFrame
+# built by get_strategies_for_date narrow
+STRATEGY_COLUMNS = "id, ticker, strategy_type, options_expiry_date, strike_sell, strike_buy, estimated_premium"
+
+# Option spread prices are quoted in $0.05 increments (20 ticks per dollar)
+TICKS_PER_DOLLAR = 20
+
+def round_credit_price(price):
+    """
+    Round a spread price onto the $0.05 grid and return it as a credit (negative)
+    
+    Works in whole ticks with round-half-away-from-zero, so values such as
+    0.025 or 0.125 don't fall to banker's rounding or float error and land
+    exactly on IBKR's price grid.
+    """
+    ticks = int(abs(price) * TICKS_PER_DOLLAR + 0.5)
+    return -ticks / TICKS_PER_DOLLAR if ticks else 0.0
+
+def empty_price_data():
+    """Price data for a leg before any ticks have arrived"""
+    return {"bid": None, "ask": None, "last": None, "model": None, "done": False}
+
 class IBWrapper(EWrapper):
     def __init__(self):
         super().__init__()
         self.next_order_id = None
         self.contract_details = {}
-        self.mid_prices = {}
+        self.mid_prices = defaultdict(empty_price_data)
         self.combo_ids = {}
         self.market_status = "unknown"  # To track market status
+        # Per-request completion events, set from the callbacks below so callers
+        # wake as soon as data arrives instead of polling on a sleep interval
+        self.details_events = {}
+        self.price_events = {}
+        self.order_events = {}
+        # Notified when the connection handshake delivers the first order ID
+        self.order_id_cv = threading.Condition()
 
     @iswrapper
     def nextValidId(self, orderId: int):
-        self.next_order_id = orderId
+        with self.order_id_cv:
+            self.next_order_id = orderId
+            self.order_id_cv.notify_all()
         logger.info(f"Next Valid Order ID: {orderId}")
     
     @iswrapper
     def tickPrice(self, reqId, tickType, price, attrib):
         if tickType in (1, 2):  # Bid or Ask
-            if reqId not in self.mid_prices:
-                self.mid_prices[reqId] = {"bid": None, "ask": None, "last": None, "model": None}
-            self.mid_prices[reqId]["bid" if tickType == 1 else "ask"] = price
-            logger.info(f"Received {'bid' if tickType == 1 else 'ask'} price for req_id {reqId}: {price}")
+            data = self.mid_prices[reqId]
+            data["bid" if tickType == 1 else "ask"] = price
+            logger.debug("Received %s price for req_id %s: %s", "bid" if tickType == 1 else "ask", reqId, price)
+            event = self.price_events.get(reqId)
+            if event is not None and data["bid"] is not None and data["ask"] is not None:
+                event.set()
     
     @iswrapper
     def tickOptionComputation(self, reqId, tickType, tickAttrib, impliedVol, delta, optPrice, pvDividend, gamma, vega, theta, undPrice):
         if optPrice is not None and tickType in (12, 13):  # 12 = last price, 13 = model price
-            if reqId not in self.mid_prices:
-                self.mid_prices[reqId] = {"bid": None, "ask": None, "last": None, "model": None}
             self.mid_prices[reqId]["last" if tickType == 12 else "model"] = optPrice
-            logger.info(f"Received {'last' if tickType == 12 else 'model'} price for req_id {reqId}: {optPrice}")
+            logger.debug("Received %s price for req_id %s: %s", "last" if tickType == 12 else "model", reqId, optPrice)
+
+    @iswrapper
+    def tickSnapshotEnd(self, reqId):
+        # IBKR has sent every field it has for this snapshot, so an illiquid
+        # leg with no bid/ask doesn't need to wait out PRICE_WAIT_TIME
+        self.mid_prices[reqId]["done"] = True
+        event = self.price_events.get(reqId)
+        if event is not None:
+            event.set()
 
     @iswrapper
     def error(self, reqId, errorCode, errorString, advancedOrderRejectJson="", connectionClosed=False):
@@ -72,22 +149,41 @@ class IBWrapper(EWrapper):
         if errorCode in [2104, 2119]:  # Known IBKR error codes for market closed
             self.market_status = "closed"
             logger.warning(f"Market appears to be closed: {errorString}")
+        # A contract details request that errors out (e.g. 200 - no security
+        # definition) never reaches contractDetailsEnd, so release its waiter here
+        event = self.details_events.get(reqId)
+        if event is not None:
+            event.set()
+        # A rejected market data request (no security definition, or no
+        # subscription) sends neither quotes nor tickSnapshotEnd
+        if errorCode in PRICE_REQUEST_ERRORS:
+            event = self.price_events.get(reqId)
+            if event is not None:
+                event.set()
+        # Likewise a rejected order never reports Submitted
+        event = self.order_events.get(reqId)
+        if event is not None:
+            event.set()
         
     @iswrapper
     def contractDetails(self, reqId, contractDetails):
         if reqId in self.combo_ids:
-            self.combo_ids[reqId] = {
+            details = {
                 "conId": contractDetails.contract.conId,
                 "symbol": contractDetails.contract.symbol,
                 "strike": contractDetails.contract.strike,
                 "right": contractDetails.contract.right,
                 "expiry": contractDetails.contract.lastTradeDateOrContractMonth
             }
-            logger.info(f"Received contract details: {self.combo_ids[reqId]['symbol']} {self.combo_ids[reqId]['expiry']} {self.combo_ids[reqId]['strike']} {self.combo_ids[reqId]['right']}, conId: {self.combo_ids[reqId]['conId']}")
+            self.combo_ids[reqId] = details
+            logger.info(f"Received contract details: {details['symbol']} {details['expiry']} {details['strike']} {details['right']}, conId: {details['conId']}")
 
     @iswrapper
     def contractDetailsEnd(self, reqId):
         logger.info(f"Contract details request {reqId} completed")
+        event = self.details_events.get(reqId)
+        if event is not None:
+            event.set()
 
     @iswrapper
     def openOrder(self, orderId, contract, order, orderState):
@@ -96,6 +192,10 @@ class IBWrapper(EWrapper):
     @iswrapper
     def orderStatus(self, orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice):
         logger.info(f"Order {orderId} status update: {status}, filled: {filled}, remaining: {remaining}")
+        if status in ("Submitted", "PreSubmitted", "Filled"):
+            event = self.order_events.get(orderId)
+            if event is not None:
+                event.set()
 
 class IBClient(EClient):
     def __init__(self, wrapper):
@@ -105,19 +205,71 @@ class IBApp(IBWrapper, IBClient):
     def __init__(self):
         IBWrapper.__init__(self)
         IBClient.__init__(self, wrapper=self)
+        # Resolved contract details keyed by contract_key(); option contract
+        # definitions don't change intra-day, so repeat legs skip the round trip
+        self._conid_cache = {}
+        # Option Contract objects by (symbol, expiry, strike, right). They are
+        # never modified after creation, so strategies sharing a leg share one
+        self._option_contracts = {}
+        # Earliest monotonic time the next outgoing message may be sent
+        self._next_send_time = 0.0
+
+    def pace_request(self):
+        """Block until one more message can be sent within MAX_MESSAGES_PER_SECOND"""
+        now = time.monotonic()
+        if now < self._next_send_time:
+            time.sleep(self._next_send_time - now)
+            now = self._next_send_time
+        self._next_send_time = now + 1.0 / MAX_MESSAGES_PER_SECOND
+
+    @staticmethod
+    def contract_key(contract):
+        """Canonical (symbol, expiry, strike, right) key for an option contract"""
+        return (contract.symbol, contract.lastTradeDateOrContractMonth,
+                float(contract.strike), contract.right)
+
+    def load_contract_cache(self, path):
+        """Load contract details saved by an earlier run today, if any"""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r') as f:
+                for entry in json.load(f):
+                    symbol, expiry, strike, right = entry["key"]
+                    self._conid_cache[(symbol, expiry, float(strike), right)] = entry["details"]
+            logger.info(f"Loaded {len(self._conid_cache)} cached contract details from {path}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load contract cache {path}: {e}")
+
+    def save_contract_cache(self, path):
+        """Persist resolved contract details so later runs today can reuse them"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump([{"key": list(key), "details": details}
+                           for key, details in self._conid_cache.items()], f)
+        except OSError as e:
+            logger.warning(f"Could not save contract cache {path}: {e}")
 
     def create_option_contract(self, symbol, expiry, strike, right):
+        expiry = expiry.replace("-", "")
+        key = (symbol, expiry, strike, right)
+        contract = self._option_contracts.get(key)
+        if contract is not None:
+            return contract
+        
         contract = Contract()
         contract.symbol = symbol
         contract.secType = "OPT"
         contract.exchange = "SMART"
         contract.currency = "USD"
-        contract.lastTradeDateOrContractMonth = expiry.replace("-", "")
+        contract.lastTradeDateOrContractMonth = expiry
         contract.strike = strike
         contract.right = right
         contract.multiplier = "100"
         
         logger.info(f"Created option contract: {symbol} {contract.lastTradeDateOrContractMonth} {strike} {right}")
+        self._option_contracts[key] = contract
         return contract
     
     def create_combo_contract(self, symbol, leg_contracts, contract_ids):
@@ -159,17 +311,9 @@ class IBApp(IBWrapper, IBClient):
         Returns:
         Order: IBKR order object
         """
-        # Ensure price is negative for vertical spreads
-        # Negative price means we're collecting a credit
-        if price > 0:
-            price = -abs(price)
-        
-        # Round price to nearest $0.05 increment for most options
-        price_increment = 0.05
-        rounded_price = round(price / price_increment) * price_increment
-        
-        # Ensure at least 2 decimal places
-        rounded_price = round(rounded_price, 2)
+        # Round to the nearest $0.05 increment and make the price negative:
+        # a negative price for a vertical spread means we're collecting a credit
+        rounded_price = round_credit_price(price)
         
         order = Order()
         order.action = action
@@ -184,55 +328,103 @@ class IBApp(IBWrapper, IBClient):
         logger.info(f"Created {action} limit order: Quantity={quantity}, Price=${rounded_price:.2f}, TIF=DAY")
         return order
     
-    def get_contract_details(self, contract, req_id):
+    def request_contract_details(self, contract, req_id):
+        """Submit a contract details request without waiting for the response"""
         self.combo_ids[req_id] = None
+        self.details_events[req_id] = threading.Event()
+        self.pace_request()
         self.reqContractDetails(req_id, contract)
-        
-        wait_time = 8
-        start_time = time.time()
-        while self.combo_ids[req_id] is None and time.time() - start_time < wait_time:
-            time.sleep(0.1)
-        return self.combo_ids.get(req_id)
 
-    def get_price_data(self, contract, req_id):
+    def wait_contract_details(self, req_id, deadline):
+        """Wait until contractDetailsEnd (or an error) arrives or the monotonic deadline passes"""
+        self.details_events[req_id].wait(max(0, deadline - time.monotonic()))
+        self.details_events.pop(req_id, None)
+        # Hand the result off and drop the slot, so a late contractDetails for
+        # a timed-out request is ignored rather than written into a stale entry
+        return self.combo_ids.pop(req_id, None)
+
+    def get_contract_details(self, contract, req_id):
+        key = self.contract_key(contract)
+        if key in self._conid_cache:
+            return self._conid_cache[key]
+        self.request_contract_details(contract, req_id)
+        details = self.wait_contract_details(req_id, time.monotonic() + DETAILS_WAIT_TIME)
+        if details:
+            self._conid_cache[key] = details
+        return details
+
+    def get_contract_details_batch(self, requests):
         """
-        Request and retrieve market data for a contract.
+        Resolve contract details for many contracts concurrently
+        
+        All requests in a batch are put on the wire back to back and then
+        awaited against a shared deadline, so the batch costs roughly one
+        round trip instead of one round trip per contract.
         
         Parameters:
-        contract (Contract): Option contract
-        req_id (int): Request ID to track this specific request
+        requests (list): (req_id, contract) pairs
         
         Returns:
-        dict: Pricing data including bid, ask, last, and model prices
+        dict: Contract details keyed by req_id (None where the request failed)
         """
+        results = {}
+        # One request per unique uncached leg; strategies sharing a leg are
+        # answered from the same response
+        pending = {}
+        for req_id, contract in requests:
+            key = self.contract_key(contract)
+            if key in self._conid_cache:
+                results[req_id] = self._conid_cache[key]
+            elif key in pending:
+                pending[key][2].append(req_id)
+            else:
+                pending[key] = (req_id, contract, [req_id])
+        
+        unique_legs = list(pending.items())
+        if unique_legs:
+            logger.info(f"Requesting contract details for {len(unique_legs)} unique legs "
+                        f"({len(requests) - len(results)} uncached requests)")
+        for start in range(0, len(unique_legs), MAX_CONCURRENT_REQUESTS):
+            batch = unique_legs[start:start + MAX_CONCURRENT_REQUESTS]
+            for key, (req_id, contract, _) in batch:
+                self.request_contract_details(contract, req_id)
+            deadline = time.monotonic() + DETAILS_WAIT_TIME
+            for key, (req_id, _, req_ids) in batch:
+                details = self.wait_contract_details(req_id, deadline)
+                if details:
+                    self._conid_cache[key] = details
+                for shared_req_id in req_ids:
+                    results[shared_req_id] = details
+        return results
+
+    def request_price_data(self, contract, req_id):
+        """Subscribe to market data for a contract without waiting for the response"""
         logger.info(f"Requesting market data for {contract.symbol} {contract.strike} {contract.right} (req_id: {req_id})")
         
-        # Clear any previous data for this req_id
-        if req_id in self.mid_prices:
-            del self.mid_prices[req_id]
-            
-        # Initialize with empty data
-        self.mid_prices[req_id] = {"bid": None, "ask": None, "last": None, "model": None}
-        
-        # Request market data
-        self.reqMktData(req_id, contract, "", False, False, [])
-        
-        # Wait for data to arrive
-        wait_time = 8  # Wait up to 5 seconds for market data
-        start_time = time.time()
-        while time.time() - start_time < wait_time:
-            # Check if we have received both bid and ask
-            if (self.mid_prices[req_id]["bid"] is not None and 
-                self.mid_prices[req_id]["ask"] is not None):
-                # We have our data, no need to wait further
-                break
-            time.sleep(0.2)
-        
-        # Cancel the market data subscription
-        self.cancelMktData(req_id)
+        # Start from empty data, discarding anything left over for this req_id
+        self.mid_prices[req_id] = empty_price_data()
+        self.price_events[req_id] = threading.Event()
+        
+        # Request a market data snapshot. reqTickByTickData("BidAsk") is not an
+        # option here: IBKR only serves tick-by-tick data for options historically,
+        # and the last/model fallbacks come from tickOptionComputation on this
+        # stream. wait_price_data returns as soon as the first bid and ask have
+        # arrived or tickSnapshotEnd reports there is nothing more to come.
+        self.pace_request()
+        self.reqMktData(req_id, contract, "", True, False, [])
+
+    def wait_price_data(self, req_id, deadline):
+        """Wait for bid and ask, the end of the snapshot or the monotonic deadline"""
+        self.price_events[req_id].wait(max(0, deadline - time.monotonic()))
+        self.price_events.pop(req_id, None)
         
         # Return the price data
-        data = self.mid_prices.get(req_id, {"bid": None, "ask": None, "last": None, "model": None})
+        data = self.mid_prices.get(req_id) or empty_price_data()
+        
+        # Cancel the snapshot if IBKR hasn't finished it yet
+        if not data["done"]:
+            self.pace_request()
+            self.cancelMktData(req_id)
         
         if data["bid"] is not None and data["ask"] is not None:
             logger.info(f"Received market data for req_id {req_id}: Bid={data['bid']}, Ask={data['ask']}")
@@ -241,130 +433,138 @@ class IBApp(IBWrapper, IBClient):
             
         return data
 
-def get_strategies_for_date(date_str=None):
+    def get_price_data(self, contract, req_id):
+        """
+        Request and retrieve market data for a contract.
+        
+        Parameters:
+        contract (Contract): Option contract
+        req_id (int): Request ID to track this specific request
+        
+        Returns:
+        dict: Pricing data including bid, ask, last, and model prices
+        """
+        self.request_price_data(contract, req_id)
+        return self.wait_price_data(req_id, time.monotonic() + PRICE_WAIT_TIME)
+
+    def get_price_data_batch(self, requests):
+        """
+        Retrieve market data for many contracts concurrently
+        
+        Parameters:
+        requests (list): (req_id, contract) pairs
+        
+        Returns:
+        dict: Pricing data keyed by req_id
+        """
+        results = {}
+        for start in range(0, len(requests), MAX_CONCURRENT_REQUESTS):
+            batch = requests[start:start + MAX_CONCURRENT_REQUESTS]
+            for req_id, contract in batch:
+                self.request_price_data(contract, req_id)
+            deadline = time.monotonic() + PRICE_WAIT_TIME
+            for req_id, _ in batch:
+                results[req_id] = self.wait_price_data(req_id, deadline)
+        return results
+
+    def wait_for_orders(self, deadline):
+        """Wait until every placed order is acknowledged or rejected, or the monotonic deadline passes"""
+        for order_id, event in list(self.order_events.items()):
+            if not event.wait(max(0, deadline - time.monotonic())):
+                logger.warning(f"No status received for order {order_id} before disconnecting")
+            self.order_events.pop(order_id, None)
+
+def get_strategies_for_date(date_str=None, conn=None):
     """
     Query strategies for a specific date using the new database configuration system
+
+    Parameters:
+    date_str (str): Date in YYYY-MM-DD format (default: today)
+    conn: Optional open database connection to read through instead of opening a new one
     """
     try:
         # Get database connection
         db_conn = get_db_connection()
         
         # Test connection
-        if not db_conn.test_connection():
+        if conn is None and not db_conn.test_connection():
             logger.error("Cannot connect to database. Check your configuration.")
             return pd.DataFrame()
         
         if date_str is None:
             date_str = datetime.datetime.now().strftime('%Y-%m-%d')
             
-        target_date = pd.to_datetime(date_str)
+        target_date = datetime.datetime.strptime(date_str, '%Y-%m-%d')
         start_date = target_date.strftime('%Y-%m-%d')
+        # Half-open [start_date, end_date) range keeps the predicate on the bare
+        # column so the scrape_date index can be used
+        end_date = (target_date + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
         
         logger.info(f"Getting strategies for date: {start_date}")
 
         # Use appropriate syntax for database type
         if db_conn.config.is_postgresql():
-            query = """
-                SELECT * FROM option_strategies 
-                WHERE date(scrape_date) = %s
+            query = f"""
+                SELECT {STRATEGY_COLUMNS} FROM option_strategies 
+                WHERE scrape_date >= %s AND scrape_date < %s
                 AND timestamp_of_trigger IS NOT NULL
                 AND (strategy_status IS NULL OR strategy_status != 'order placed')
             """
-            df = db_conn.execute_query_df(query, (start_date,))
         else:
-            query = """
-                SELECT * FROM option_strategies 
-                WHERE date(scrape_date) = ?
+            query = f"""
+                SELECT {STRATEGY_COLUMNS} FROM option_strategies 
+                WHERE scrape_date >= ? AND scrape_date < ?
                 AND timestamp_of_trigger IS NOT NULL
                 AND (strategy_status IS NULL OR strategy_status != 'order placed')
             """
-            df = db_conn.execute_query_df(query, (start_date,))
         
+        if conn is None:
+            return db_conn.execute_query_df(query, (start_date, end_date))
+        df = pd.read_sql_query(query, conn, params=(start_date, end_date))
+        # End the read transaction so the caller's connection isn't left idle in
+        # transaction (and open to idle_in_transaction_session_timeout) while
+        # it waits on IBKR
+        conn.commit()
         return df
         
     except Exception as e:
         logger.error(f"Error querying strategies for date: {str(e)}")
         return pd.DataFrame()
 
-def get_last_prices_from_db(ticker, strike_sell, strike_buy, right):
-    """
-    Get last prices from database using the new database configuration system
+def queue_strategy_status(pending_updates, strategy_id, status, premium):
     """
-    try:
-        # Get database connection
-        db_conn = get_db_connection()
-        
-        # Test connection
-        if not db_conn.test_connection():
-            logger.error("Cannot connect to database. Check your configuration.")
-            return None, None
-        
-        # Query sell leg price
-        sell_price = None
-        if db_conn.config.is_postgresql():
-            query_sell = """
-                SELECT last_price_when_checked FROM option_strategies 
-                WHERE ticker = %s AND strike_sell = %s AND last_price_when_checked IS NOT NULL
-                ORDER BY timestamp_of_price_when_last_checked DESC LIMIT 1
-            """
-        else:
-            query_sell = """
-                SELECT last_price_when_checked FROM option_strategies 
-                WHERE ticker = ? AND strike_sell = ? AND last_price_when_checked IS NOT NULL
-                ORDER BY timestamp_of_price_when_last_checked DESC LIMIT 1
-            """
-        
-        result = db_conn.execute_query(query_sell, (ticker, strike_sell))
-        if result:
-            sell_price = result[0][0]
-        
-        # Query buy leg price
-        buy_price = None
-        if db_conn.config.is_postgresql():
-            query_buy = """
-                SELECT last_price_when_checked FROM option_strategies 
-                WHERE ticker = %s AND strike_buy = %s AND last_price_when_checked IS NOT NULL
-                ORDER BY timestamp_of_price_when_last_checked DESC LIMIT 1
-            """
-        else:
-            query_buy = """
-                SELECT last_price_when_checked FROM option_strategies 
-                WHERE ticker = ? AND strike_buy = ? AND last_price_when_checked IS NOT NULL
-                ORDER BY timestamp_of_price_when_last_checked DESC LIMIT 1
-            """
-        
-        result = db_conn.execute_query(query_buy, (ticker, strike_buy))
-        if result:
-            buy_price = result[0][0]
-        
-        if sell_price: logger.info(f"Found historical sell price for {ticker} {strike_sell} {right}: {sell_price}")
-        if buy_price: logger.info(f"Found historical buy price for {ticker} {strike_buy} {right}: {buy_price}")
-        
-        return sell_price, buy_price
-        
-    except Exception as e:
-        logger.error(f"Error getting last prices from database: {str(e)}")
-        return None, None
-
-def update_strategy_status(strategy_id, status, premium):
-    """
-    Update strategy status in database using the new database configuration system
+    Queue a strategy status update for flush_strategy_statuses
     
     Parameters:
+    pending_updates (list): Queue of (status, premium, id) tuples
     strategy_id (int): ID of the strategy to update
     status (str): Status to set
     premium (float): Premium value to record
+    """
+    pending_updates.append((status, premium, strategy_id))
+    logger.info(f"Queued status for strategy ID {strategy_id}: {status}, premium: {premium}")
+
+def flush_strategy_statuses(pending_updates, conn):
+    """
+    Write queued strategy status updates in one executemany and commit
+    
+    Every update in the flush is stamped with the same timestamp_of_order,
+    taken once here. 'order placed' is flushed as soon as the order is sent,
+    so its timestamp is still the time of the order.
+    
+    Parameters:
+    pending_updates (list): Queue filled by queue_strategy_status; emptied on success
+    conn (connection): Open database connection
     
     Returns:
-    bool: True if update was successful, False otherwise
+    bool: True if the updates were written, False otherwise
     """
+    if not pending_updates:
+        return True
+    
     try:
-        # Get database connection
         db_conn = get_db_connection()
         
-        current_timestamp = datetime.datetime.now().isoformat()
-        
-        # Update the record using appropriate syntax
         if db_conn.config.is_postgresql():
             update_query = """
                 UPDATE option_strategies 
@@ -378,184 +578,214 @@ def update_strategy_status(strategy_id, status, premium):
                 WHERE id = ?
             """
         
-        rows_affected = db_conn.execute_command(
-            update_query, 
+        current_timestamp = datetime.datetime.now().isoformat()
+        cursor = db_conn.get_cursor(conn)
+        cursor.executemany(update_query, [
             (status, premium, current_timestamp, strategy_id)
-        )
+            for status, premium, strategy_id in pending_updates
+        ])
+        conn.commit()
+        
+        logger.info(f"Wrote {len(pending_updates)} strategy status updates")
+        pending_updates.clear()
+        return True
         
-        if rows_affected > 0:
-            logger.info(f"Updated strategy ID {strategy_id} with status: {status}, premium: {premium}")
-            return True
-        else:
-            logger.warning(f"No rows updated for strategy ID {strategy_id}")
-            return False
-            
     except Exception as e:
-        logger.error(f"Database error updating strategy: {e}")
+        logger.error(f"Database error writing strategy statuses: {e}")
+        conn.rollback()
         return False
 
-def calculate_spread_premium(sell_data, buy_data):
+def calculate_spread_premium_vec(sell_bid, sell_ask, buy_bid, buy_ask,
+                                 sell_last, buy_last, sell_model, buy_model):
     """
-    Calculate the current market premium for a vertical spread
+    Calculate the current market premium for vertical spreads over whole
+    columns of leg prices
+    
+    Missing prices are passed as NaN. Per element the first usable method wins:
+    no_market_data (-1.0 quotes), midpoint, conservative (sell bid - buy ask),
+    last, model.
     
     Parameters:
-    sell_data (dict): Market data for the sell leg
-    buy_data (dict): Market data for the buy leg
+    sell_bid, sell_ask, buy_bid, buy_ask (array-like): Quotes for each leg
+    sell_last, buy_last (array-like): Last prices for each leg
+    sell_model, buy_model (array-like): Model prices for each leg
     
     Returns:
-    tuple: (premium amount, description of calculation method used)
+    tuple: (premium array with NaN where unavailable, calculation method array)
     """
-    premium = None
-    calc_method = "unknown"
-    
-    # Check for -1.0 prices which indicate no market data available
-    if (sell_data["bid"] == -1.0 or sell_data["ask"] == -1.0 or 
-        buy_data["bid"] == -1.0 or buy_data["ask"] == -1.0):
-        return None, "no_market_data"
-    
-    # Check if we have valid bid/ask for both legs
-    if (sell_data["bid"] is not None and sell_data["ask"] is not None and
-        buy_data["bid"] is not None and buy_data["ask"] is not None and
-        sell_data["bid"] > 0 and sell_data["ask"] > 0 and
-        buy_data["bid"] > 0 and buy_data["ask"] > 0):
-        # Use midpoint prices for more accurate premium calculation
-        sell_midpoint = (sell_data["bid"] + sell_data["ask"]) / 2
-        buy_midpoint = (buy_data["bid"] + buy_data["ask"]) / 2
-        premium = (sell_midpoint - buy_midpoint) * 100  # Convert to premium per contract
-        calc_method = "midpoint"
-    # Fallback to bid/ask if midpoints can't be calculated
-    elif (sell_data["bid"] is not None and buy_data["ask"] is not None and
-          sell_data["bid"] > 0 and buy_data["ask"] > 0):
-        # Conservative estimate: what we can sell at bid and buy at ask
-        premium = (sell_data["bid"] - buy_data["ask"]) * 100
-        calc_method = "conservative"
-    # Use last prices if available
-    elif (sell_data["last"] is not None and buy_data["last"] is not None and
-          sell_data["last"] > 0 and buy_data["last"] > 0):
-        premium = (sell_data["last"] - buy_data["last"]) * 100
-        calc_method = "last"
-    # Use model prices if available
-    elif (sell_data["model"] is not None and buy_data["model"] is not None and
-          sell_data["model"] > 0 and buy_data["model"] > 0):
-        premium = (sell_data["model"] - buy_data["model"]) * 100
-        calc_method = "model"
-        
+    sell_bid, sell_ask, buy_bid, buy_ask, sell_last, buy_last, sell_model, buy_model = (
+        np.asarray(a, dtype=float) for a in
+        (sell_bid, sell_ask, buy_bid, buy_ask, sell_last, buy_last, sell_model, buy_model))
+    
+    with np.errstate(invalid='ignore'):
+        no_market_data = ((sell_bid == -1.0) | (sell_ask == -1.0) |
+                          (buy_bid == -1.0) | (buy_ask == -1.0))
+        midpoint = (sell_bid > 0) & (sell_ask > 0) & (buy_bid > 0) & (buy_ask > 0)
+        conservative = (sell_bid > 0) & (buy_ask > 0)
+        last = (sell_last > 0) & (buy_last > 0)
+        model = (sell_model > 0) & (buy_model > 0)
+    
+    conditions = [no_market_data, midpoint, conservative, last, model]
+    premium = np.select(conditions, [
+        np.nan,
+        ((sell_bid + sell_ask) / 2 - (buy_bid + buy_ask) / 2) * 100,
+        (sell_bid - buy_ask) * 100,
+        (sell_last - buy_last) * 100,
+        (sell_model - buy_model) * 100,
+    ], default=np.nan)
+    calc_method = np.select(conditions, [
+        "no_market_data", "midpoint", "conservative", "last", "model"
+    ], default="unknown")
+    
     return premium, calc_method
 
-def run_trading_app(target_date=None, ibkr_host='127.0.0.1', ibkr_port=4002, 
-                   client_id=None, allow_market_closed=False):
-    if target_date is None:
-        target_date = datetime.datetime.now().strftime('%Y-%m-%d')
+def _price_column(price_data, field):
+    """Collect one price field from a list of get_price_data results, None -> NaN"""
+    return np.array([np.nan if data[field] is None else data[field] for data in price_data], dtype=float)
+
+def process_strategies(app, df, conn, allow_market_closed=False):
+    """
+    Price each strategy in df and place orders for those that qualify
     
-    if client_id is None:
-        client_id = random.randint(100, 9999)
+    Parameters:
+    app (IBApp): Connected IBKR application
+    df (DataFrame): Strategies returned by get_strategies_for_date
+    conn (connection): Open database connection used for all status updates
+    allow_market_closed (bool): Place orders even if the market looks closed
+    """
+    # Status updates are queued and written together; see flush_strategy_statuses
+    pending_updates = []
+    try:
+        _process_strategies(app, df, conn, pending_updates, allow_market_closed)
+    finally:
+        flush_strategy_statuses(pending_updates, conn)
+
+def _process_strategies(app, df, conn, pending_updates, allow_market_closed):
+    # Derive per-strategy fields for the whole batch in one vectorised pass so
+    # the loops below only carry the IBKR round trips
+    df = df.copy()
+    premium = pd.to_numeric(df['estimated_premium'], errors='coerce')
+    df['option_right'] = df['strategy_type'].map(STRATEGY_RIGHTS)
+    df['premium_valid'] = premium > 0
+    # Same tick rounding as round_credit_price, on the per-share price
+    df['limit_price'] = -np.floor(premium.abs() / 100 * TICKS_PER_DOLLAR + 0.5) / TICKS_PER_DOLLAR
+    # IBKR's YYYYMMDD expiry, formatted once per batch; astype(str) also covers
+    # PostgreSQL returning DATE values rather than strings
+    df['expiry_fmt'] = df['options_expiry_date'].astype(str).str.replace('-', '', regex=False)
     
-    logger.info(f"Processing strategies for date: {target_date}")
-    logger.info(f"Market closed orders allowed: {allow_market_closed}")
+    for row in df[df['option_right'].isna()].itertuples(index=False):
+        logger.error(f"Unknown strategy type: {row.strategy_type}")
+    df = df[df['option_right'].notna()]
     
-    # Get strategies
-    df = get_strategies_for_date(target_date)
-    if df.empty:
-        logger.info(f"No strategies found for {target_date}")
-        return
-    
-    logger.info(f"Found {len(df)} strategies to process")
-    
-    # Connect to IB Gateway
-    app = IBApp()
-    app.connect(ibkr_host, ibkr_port, client_id)
-    
-    ibkr_thread = threading.Thread(target=app.run)
-    ibkr_thread.start()
-    
-    timeout = 10
-    start_time = time.time()
-    while not app.next_order_id and time.time() - start_time < timeout:
-        time.sleep(0.1)
-    
-    if not app.next_order_id:
-        logger.error("Failed to connect to IB Gateway or get valid order ID")
-        app.disconnect()
-        return
-    
-    # Process strategies
-    for idx, row in df.iterrows():
-        ticker = row['ticker']
-        expiry = row['options_expiry_date']
-        strategy_type = row['strategy_type']
-        strike_buy = row['strike_buy']
-        strike_sell = row['strike_sell']
-        estimated_premium = row['estimated_premium']
-        
-        logger.info(f"Processing {strategy_type} for {ticker}, expiry {expiry}")
-        
-        # Set up contracts based on strategy type
-        if strategy_type == 'Bear Call':
-            sell_contract = app.create_option_contract(ticker, expiry, strike_sell, "C")
-            buy_contract = app.create_option_contract(ticker, expiry, strike_buy, "C")
-            combo_action = "BUY"
-            option_right = "C"
-        elif strategy_type == 'Bull Put':
-            sell_contract = app.create_option_contract(ticker, expiry, strike_sell, "P")
-            buy_contract = app.create_option_contract(ticker, expiry, strike_buy, "P")
-            combo_action = "BUY"
-            option_right = "P"
-        else:
-            logger.error(f"Unknown strategy type: {strategy_type}")
-            continue
-        
-        # Get contract details
-        req_id_sell = app.next_order_id
-        app.next_order_id += 1
-        sell_details = app.get_contract_details(sell_contract, req_id_sell)
-        
-        req_id_buy = app.next_order_id
-        app.next_order_id += 1
-        buy_details = app.get_contract_details(buy_contract, req_id_buy)
+    for row in df[~df['premium_valid']].itertuples(index=False):
+        logger.error(f"Invalid estimated premium: {row.estimated_premium}")
+        queue_strategy_status(pending_updates, row.id, 'invalid premium', 0)
+    df = df[df['premium_valid']]
+    
+    # Rows without an expiry or both strikes can't be priced, so drop them
+    # before any IBKR requests are made for them
+    legs_valid = df['options_expiry_date'].notna() & df['strike_sell'].notna() & df['strike_buy'].notna()
+    for row in df[~legs_valid].itertuples(index=False):
+        logger.error(f"Incomplete legs for strategy ID {row.id}: expiry={row.options_expiry_date}, "
+                     f"sell={row.strike_sell}, buy={row.strike_buy}")
+        queue_strategy_status(pending_updates, row.id, 'invalid legs', 0)
+    df = df[legs_valid]
+    
+    # Reserve a contiguous block of ids for the whole batch (two details
+    # requests, two price requests and one order per strategy) so
+    # next_order_id is only mutated once from this thread
+    req_ids = itertools.count(app.next_order_id)
+    app.next_order_id += 5 * len(df)
+    
+    # Build the option legs for every strategy up front
+    strategies = []
+    for row in df.itertuples(index=False):
+        logger.info(f"Processing {row.strategy_type} for {row.ticker}, expiry {row.options_expiry_date}")
+        
+        sell_contract = app.create_option_contract(row.ticker, row.expiry_fmt, row.strike_sell, row.option_right)
+        buy_contract = app.create_option_contract(row.ticker, row.expiry_fmt, row.strike_buy, row.option_right)
+        
+        req_id_sell = next(req_ids)
+        req_id_buy = next(req_ids)
+        
+        strategies.append({
+            "row": row,
+            "sell_contract": sell_contract,
+            "buy_contract": buy_contract,
+            "req_id_sell": req_id_sell,
+            "req_id_buy": req_id_buy,
+        })
+    
+    # Get contract details for every leg of every strategy in one pipelined pass
+    details = app.get_contract_details_batch(
+        [(s["req_id_sell"], s["sell_contract"]) for s in strategies] +
+        [(s["req_id_buy"], s["buy_contract"]) for s in strategies]
+    )
+    
+    priced_strategies = []
+    for strategy in strategies:
+        row = strategy["row"]
+        strategy["sell_details"] = details.get(strategy["req_id_sell"])
+        strategy["buy_details"] = details.get(strategy["req_id_buy"])
         
-        if not sell_details or not buy_details:
+        if not strategy["sell_details"] or not strategy["buy_details"]:
             logger.error(f"Could not get contract details for one or both legs")
-            update_strategy_status(row['id'], 'missing contract details', 0)
+            queue_strategy_status(pending_updates, row.id, 'missing contract details', 0)
             continue
         
+        strategy["req_id_sell_price"] = next(req_ids)
+        strategy["req_id_buy_price"] = next(req_ids)
+        priced_strategies.append(strategy)
+    
+    # Get current market prices for every remaining leg in one pipelined pass
+    prices = app.get_price_data_batch(
+        [(s["req_id_sell_price"], s["sell_contract"]) for s in priced_strategies] +
+        [(s["req_id_buy_price"], s["buy_contract"]) for s in priced_strategies]
+    )
+    
+    # Calculate the actual market premium for every strategy in one pass
+    sell_prices = [prices[s["req_id_sell_price"]] for s in priced_strategies]
+    buy_prices = [prices[s["req_id_buy_price"]] for s in priced_strategies]
+    market_premiums, calc_methods = calculate_spread_premium_vec(
+        _price_column(sell_prices, "bid"), _price_column(sell_prices, "ask"),
+        _price_column(buy_prices, "bid"), _price_column(buy_prices, "ask"),
+        _price_column(sell_prices, "last"), _price_column(buy_prices, "last"),
+        _price_column(sell_prices, "model"), _price_column(buy_prices, "model"),
+    )
+    estimated_premiums = np.array([s["row"].estimated_premium for s in priced_strategies], dtype=float)
+    with np.errstate(invalid='ignore'):
+        # NaN market premiums compare False, leaving those rows to the fallbacks below
+        premium_ok = market_premiums >= estimated_premiums
+    # Same tick rounding as round_credit_price, on the market premium per share
+    market_limit_prices = -np.floor(np.abs(market_premiums) / 100 * TICKS_PER_DOLLAR + 0.5) / TICKS_PER_DOLLAR
+    
+    # Decide and place orders
+    for strategy, market_premium, calc_method, market_ok, market_limit_price in zip(
+            priced_strategies, market_premiums, calc_methods, premium_ok, market_limit_prices):
+        row = strategy["row"]
+        ticker = row.ticker
+        estimated_premium = row.estimated_premium
+        
         try:
-            # Check for valid estimated premium
-            if estimated_premium is None or pd.isna(estimated_premium) or float(estimated_premium) <= 0:
-                logger.error(f"Invalid estimated premium: {estimated_premium}")
-                update_strategy_status(row['id'], 'invalid premium', 0)
-                continue
-            
-            # Get current market prices
-            req_id_sell_price = app.next_order_id
-            app.next_order_id += 1
-            sell_price_data = app.get_price_data(sell_contract, req_id_sell_price)
-            
-            req_id_buy_price = app.next_order_id
-            app.next_order_id += 1
-            buy_price_data = app.get_price_data(buy_contract, req_id_buy_price)
-            
-            # Calculate the actual market premium
-            market_premium, calc_method = calculate_spread_premium(sell_price_data, buy_price_data)
+            market_premium = None if np.isnan(market_premium) else float(market_premium)
+            calc_method = str(calc_method)
             
             # Determine if we should place an order
             place_order = False
             
-            # Ensure price is negative for credit collected
-            limit_price = -abs(float(estimated_premium) / 100)
-            limit_price = round(limit_price * 20) / 20  # Round to nearest 0.05 increment
+            # Negative (credit) limit price on the $0.05 grid, precomputed above
+            limit_price = row.limit_price
             
             if market_premium is not None:
                 logger.info(f"Calculated market premium: ${market_premium:.2f} using {calc_method} method")
                 logger.info(f"Estimated premium: ${estimated_premium:.2f}")
                 
                 # Compare estimated vs market premium
-                if market_premium >= float(estimated_premium):
+                if market_ok:
                     place_order = True
                     logger.info(f"Market premium (${market_premium:.2f}) is >= estimated premium (${estimated_premium:.2f})")
                     # Use market premium for limit price when it's better
-                    market_limit_price = -abs(market_premium / 100)  # Make sure it's negative
-                    market_limit_price = round(market_limit_price * 20) / 20  # Round to nearest 0.05
-                    limit_price = market_limit_price
+                    limit_price = float(market_limit_price)
                 else:
                     logger.info(f"Market premium (${market_premium:.2f}) is less than estimated premium (${estimated_premium:.2f})")
                     # Check if market is closed but we're allowed to place orders
@@ -572,7 +802,7 @@ def run_trading_app(target_date=None, ibkr_host='127.0.0.1', ibkr_port=4002,
                     place_order = True
                     logger.info("Market appears closed but allow_market_closed flag is set, using estimated premium")
                 else:
-                    update_strategy_status(row['id'], 'insufficient market data', 0)
+                    queue_strategy_status(pending_updates, row.id, 'insufficient market data', 0)
                     continue
             
             # Place the order if conditions are met
@@ -580,36 +810,92 @@ def run_trading_app(target_date=None, ibkr_host='127.0.0.1', ibkr_port=4002,
                 logger.info(f"Placing order with limit price: ${limit_price:.2f} per share (TIF=DAY, Quantity=1)")
                 
                 # Create and place orders
-                sell_conId = sell_details['conId']
-                buy_conId = buy_details['conId']
+                sell_conId = strategy["sell_details"]['conId']
+                buy_conId = strategy["buy_details"]['conId']
                 
                 combo_contract = app.create_combo_contract(
-                    ticker, [buy_contract, sell_contract], [buy_conId, sell_conId])
+                    ticker, [strategy["buy_contract"], strategy["sell_contract"]], [buy_conId, sell_conId])
                 
                 # Place the entry order
-                order_id = app.next_order_id
-                app.next_order_id += 1
-                order = app.create_limit_order(combo_action, 1, limit_price)
+                order_id = next(req_ids)
+                order = app.create_limit_order("BUY", 1, limit_price)
                 
+                app.order_events[order_id] = threading.Event()
+                app.pace_request()
                 app.placeOrder(order_id, combo_contract, order)
                 
                 logger.info(f"Placed entry order: ID {order_id}")
-                update_strategy_status(row['id'], 'order placed', 
+                queue_strategy_status(pending_updates, row.id, 'order placed', 
                                       market_premium if market_premium is not None else estimated_premium)
+                # Persist straight away: this status is what stops a later run
+                # from placing the same order again
+                flush_strategy_statuses(pending_updates, conn)
             else:
                 logger.info("No order placed due to insufficient premium")
-                update_strategy_status(row['id'], 'premium too low', 
+                queue_strategy_status(pending_updates, row.id, 'premium too low', 
                                       market_premium if market_premium is not None else 0)
             
         except Exception as e:
-            logger.error(f"Error processing order: {str(e)}")
-            import traceback
-            logger.error(f"Exception details: {traceback.format_exc()}")
-            update_strategy_status(row['id'], 'error', 0)
+            logger.exception(f"Error processing order for strategy ID {row.id}: {str(e)}")
+            queue_strategy_status(pending_updates, row.id, 'error', 0)
+
+def run_trading_app(target_date=None, ibkr_host='127.0.0.1', ibkr_port=4002, 
+                   client_id=None, allow_market_closed=False):
+    if target_date is None:
+        target_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    
+    if client_id is None:
+        # Derived from the PID so concurrent runs on this host don't collide
+        client_id = (os.getpid() % 9000) + 1000
+    
+    logger.info(f"Processing strategies for date: {target_date}")
+    logger.info(f"Market closed orders allowed: {allow_market_closed}")
+    
+    # One database connection serves the strategy read and every status
+    # update in this run, so connection setup is paid once and the page
+    # cache stays warm between the read and the writes
+    db_conn = get_db_connection()
+    with db_conn.get_connection(long_lived=True) as conn:
+        # Get strategies
+        df = get_strategies_for_date(target_date, conn)
+        if df.empty:
+            logger.info(f"No strategies found for {target_date}")
+            return
+        
+        logger.info(f"Found {len(df)} strategies to process")
+        
+        # Connect to IB Gateway
+        app = IBApp()
+        app.connect(ibkr_host, ibkr_port, client_id)
+        
+        # The reader thread only dispatches callbacks; the main thread blocks on
+        # events rather than polling, so the two don't contend for the GIL
+        ibkr_thread = threading.Thread(target=app.run, daemon=True)
+        ibkr_thread.start()
+        
+        timeout = 10
+        with app.order_id_cv:
+            app.order_id_cv.wait_for(lambda: app.next_order_id, timeout)
+        
+        if not app.next_order_id:
+            logger.error("Failed to connect to IB Gateway or get valid order ID")
+            app.disconnect()
+            ibkr_thread.join(timeout=2)
+            return
+        
+        # Reuse contract details resolved by earlier runs today
+        contract_cache_path = os.path.join(
+            contract_cache_dir, f"contract_details_{datetime.date.today().strftime('%Y%m%d')}.json")
+        app.load_contract_cache(contract_cache_path)
+        
+        process_strategies(app, df, conn, allow_market_closed)
+    
+    app.save_contract_cache(contract_cache_path)
     
-    # Cleanup
-    time.sleep(3)
+    # Cleanup, once IBKR has acknowledged the orders placed in this run
+    app.wait_for_orders(time.monotonic() + ORDER_WAIT_TIME)
     app.disconnect()
+    ibkr_thread.join(timeout=2)
     logger.info("Disconnected from IB Gateway")
 
 def parse_arguments():
@@ -622,7 +908,7 @@ def parse_arguments():
     parser.add_argument('--date', type=str, default=None,
                        help='Target date for strategies (YYYY-MM-DD format, default: today)')
     parser.add_argument('--client', type=int, default=None,
-                       help='Client ID for IBKR connection (random if not specified)')
+                       help='Client ID for IBKR connection (derived from the process ID if not specified)')
     parser.add_argument('--allow-market-closed', action='store_true',
                        help='Allow orders to be placed even if market is closed')
     
@@ -7,18 +7,19 @@ def generate_coolname_trade_id(scrape_date, strategy_type, tab_name, ticker, tri
     """
     # Create the same combined string as before
     components = [
-        str(scrape_date) if scrape_date is not None else '',
-        str(strategy_type) if strategy_type is not None else '',
-        str(tab_name) if tab_name is not None else '',
-        str(ticker) if ticker is not None else '',
-        str(trigger_price) if trigger_price is not None else '',
-        str(strike_price) if strike_price is not None else ''
+        str(scrape_date).encode('utf-8') if scrape_date is not None else b'',
+        str(strategy_type).encode('utf-8') if strategy_type is not None else b'',
+        str(tab_name).encode('utf-8') if tab_name is not None else b'',
+        str(ticker).encode('utf-8') if ticker is not None else b'',
+        str(trigger_price).encode('utf-8') if trigger_price is not None else b'',
+        str(strike_price).encode('utf-8') if strike_price is not None else b''
     ]
-    combined_string = '|'.join(components)
+    combined_bytes = b'|'.join(components)
     
     # Generate hash and use it as seed for reproducible results
-    hash_value = hashlib.sha256(combined_string.encode('utf-8')).hexdigest()
-    hash_seed = int(hash_value[:8], 16)  # Use first 8 chars as seed
+    digest = hashlib.sha256(combined_bytes).digest()
+    hash_value = digest.hex()
+    hash_seed = int.from_bytes(digest[:4], 'big')  # First 4 bytes (8 hex chars) as seed
     
     # Generate deterministic coolname
     trade_id = coolname.generate(2, seed=hash_seed)  # 2 words
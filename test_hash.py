@@ -2,15 +2,15 @@ import hashlib
 
 def generate_trade_id(scrape_date, strategy_type, tab_name, ticker, trigger_price, strike_price):
     components = [
-        str(scrape_date) if scrape_date is not None else "",
-        str(strategy_type) if strategy_type is not None else "",
-        str(tab_name) if tab_name is not None else "",
-        str(ticker) if ticker is not None else "",
-        str(trigger_price) if trigger_price is not None else "",
-        str(strike_price) if strike_price is not None else ""
+        str(scrape_date).encode("utf-8") if scrape_date is not None else b"",
+        str(strategy_type).encode("utf-8") if strategy_type is not None else b"",
+        str(tab_name).encode("utf-8") if tab_name is not None else b"",
+        str(ticker).encode("utf-8") if ticker is not None else b"",
+        str(trigger_price).encode("utf-8") if trigger_price is not None else b"",
+        str(strike_price).encode("utf-8") if strike_price is not None else b""
     ]
-    combined_string = "|".join(components)
-    hash_object = hashlib.sha256(combined_string.encode("utf-8"))
+    combined_bytes = b"|".join(components)
+    hash_object = hashlib.sha256(combined_bytes)
     return hash_object.hexdigest()
 
 print("Testing edge cases and uniqueness:")
@@ -3,63 +3,74 @@
 Test script for database migration functionality
 """
 
-import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Add paths for imports
 sys.path.append('database')
 
-from database_config import get_db_connection, setup_database
+from database_config import DatabaseConfig, get_db_connection, setup_database
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def test_sqlite_connection():
-    """Test SQLite connection and functionality"""
-    print("\n=== Testing SQLite Connection ===")
-    
-    # Ensure we're using SQLite
-    os.environ['DB_TYPE'] = 'sqlite'
+def buffered_report(test):
+    """
+    Collect a test's report lines and write them to stdout in one call, so
+    reports from concurrently running tests do not interleave
+    """
+    def run():
+        lines = []
+        try:
+            return test(lines)
+        finally:
+            sys.stdout.write('\n'.join(lines) + '\n')
     
-    db = get_db_connection()
-    print(f"Database type: {db.config.db_type}")
+    # Copied by hand rather than with functools.wraps, so the wrapper's own
+    # (empty) signature is what test runners see
+    run.__name__ = test.__name__
+    run.__doc__ = test.__doc__
+    return run
+
+@buffered_report
+def test_sqlite_connection(lines):
+    """Test SQLite connection and functionality"""
+    lines.append("\n=== Testing SQLite Connection ===")
     
-    # Test connection
-    if not db.test_connection():
-        print("❌ SQLite connection failed")
-        return False
-    print("✅ SQLite connection successful")
+    # Ensure we're using SQLite regardless of the environment
+    db = get_db_connection(DatabaseConfig.from_params(db_type='sqlite'))
+    lines.append(f"Database type: {db.config.db_type}")
     
-    # Test table exists
-    if not db.table_exists():
-        print("❌ Table doesn't exist")
+    # Connection, table and row count checked on a single connection
+    health = db.health_check()
+    if health is None:
+        lines.append("❌ SQLite connection failed")
         return False
-    print("✅ Table exists")
+    lines.append("✅ SQLite connection successful")
     
-    # Test query
-    try:
-        count_result = db.execute_query("SELECT COUNT(*) FROM option_strategies")
-        count = count_result[0][0] if count_result else 0
-        print(f"✅ Record count: {count}")
-    except Exception as e:
-        print(f"❌ Query failed: {e}")
+    _, exists, count = health
+    if not exists:
+        lines.append("❌ Table doesn't exist")
         return False
+    lines.append("✅ Table exists")
+    lines.append(f"✅ Record count: {count}")
     
     return True
 
-def test_database_functions():
+@buffered_report
+def test_database_functions(lines):
     """Test database functions from notebooks"""
-    print("\n=== Testing Database Functions ===")
+    lines.append("\n=== Testing Database Functions ===")
     
     try:
         # Test setup function
         success = setup_database()
         if success:
-            print("✅ Database setup successful")
+            lines.append("✅ Database setup successful")
         else:
-            print("❌ Database setup failed")
+            lines.append("❌ Database setup failed")
             return False
         
         # Test some sample queries
@@ -69,68 +80,74 @@ def test_database_functions():
         strategy_results = db.execute_query(
             "SELECT strategy_type, COUNT(*) FROM option_strategies GROUP BY strategy_type"
         )
-        print(f"✅ Strategy types query: {len(strategy_results)} types found")
+        lines.append(f"✅ Strategy types query: {len(strategy_results)} types found")
         
         # Test DataFrame query
         df = db.execute_query_df("SELECT * FROM option_strategies LIMIT 5")
-        print(f"✅ DataFrame query: {len(df)} records retrieved")
+        lines.append(f"✅ DataFrame query: {len(df)} records retrieved")
         
         return True
         
     except Exception as e:
-        print(f"❌ Database functions test failed: {e}")
+        lines.append(f"❌ Database functions test failed: {e}")
         return False
 
-def test_postgresql_config():
+@buffered_report
+def test_postgresql_config(lines):
     """Test PostgreSQL configuration (without actual connection)"""
-    print("\n=== Testing PostgreSQL Configuration ===")
-    
-    # Set PostgreSQL environment
-    os.environ['DB_TYPE'] = 'postgresql'
-    os.environ['DB_HOST'] = 'localhost'
-    os.environ['DB_PORT'] = '5432'
-    os.environ['DB_NAME'] = 'option_strategies'
-    os.environ['DB_USER'] = 'test_user'
-    os.environ['DB_PASSWORD'] = 'test_password'
+    lines.append("\n=== Testing PostgreSQL Configuration ===")
     
     try:
-        # Import fresh to pick up new env vars
-        from importlib import reload
-        import database_config
-        reload(database_config)
-        from database_config import get_db_connection
-        
-        db = get_db_connection()
-        print(f"✅ PostgreSQL config loaded: {db.config.db_type}")
-        print(f"✅ Connection string format: postgresql://...")
-        
-        # Reset to SQLite for other tests
-        os.environ['DB_TYPE'] = 'sqlite'
+        # Pass the settings directly; no env changes or module reload needed
+        config = DatabaseConfig.from_params(
+            db_type='postgresql',
+            host='localhost',
+            port=5432,
+            database='option_strategies',
+            user='test_user',
+            password='test_password'
+        )
+        db = get_db_connection(config)
+        lines.append(f"✅ PostgreSQL config loaded: {db.config.db_type}")
+        lines.append(f"✅ Connection string format: postgresql://...")
         
         return True
         
     except Exception as e:
-        print(f"❌ PostgreSQL config test failed: {e}")
+        lines.append(f"❌ PostgreSQL config test failed: {e}")
         return False
 
+def run_tests(tests):
+    """Run tests in order, counting a crash as a failure"""
+    results = []
+    for test in tests:
+        try:
+            results.append(test())
+        except Exception as e:
+            print(f"❌ Test {test.__name__} crashed: {e}")
+            results.append(False)
+    return results
+
 def main():
     """Run all tests"""
     print("🚀 Starting Database Migration Tests")
     
-    tests = [
-        test_sqlite_connection,
+    # Tests that share the database run one after another, starting with
+    # test_database_functions since its setup_database() creates the table
+    # the SQLite test checks for. The PostgreSQL config test never connects,
+    # so it runs alongside them.
+    database_tests = [
         test_database_functions,
+        test_sqlite_connection,
+    ]
+    independent_tests = [
         test_postgresql_config,
     ]
     
-    results = []
-    for test in tests:
-        try:
-            result = test()
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Test {test.__name__} crashed: {e}")
-            results.append(False)
+    with ThreadPoolExecutor(max_workers=1 + len(independent_tests)) as executor:
+        futures = [executor.submit(run_tests, database_tests)]
+        futures += [executor.submit(run_tests, [test]) for test in independent_tests]
+        results = [result for future in futures for result in future.result()]
     
     print(f"\n📊 Test Results: {sum(results)}/{len(results)} passed")
     
@@ -139,6 +156,7 @@ def main():
     else:
         print("⚠️  Some tests failed. Check the output above.")
     
+    sys.stdout.flush()
     return all(results)
 
 if __name__ == "__main__":
@@ -1,56 +1,133 @@
 import hashlib
-import random
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 
 # Simple word lists for mnemonic generation
 ADJECTIVES = [
     'blue', 'red', 'green', 'fast', 'slow', 'big', 'small', 'hot', 'cold', 'bright',
     'dark', 'light', 'heavy', 'soft', 'hard', 'smooth', 'rough', 'clean', 'dirty', 'fresh',
-    'old', 'new', 'young', 'wise', 'brave', 'calm', 'bold', 'cool', 'warm', 'sharp'
+    'old', 'new', 'young', 'wise', 'brave', 'calm', 'bold', 'cool', 'warm', 'sharp',
+    'quick', 'quiet'
 ]
 
 NOUNS = [
     'cat', 'dog', 'bird', 'fish', 'tree', 'rock', 'star', 'moon', 'sun', 'wave',
     'fire', 'wind', 'rain', 'snow', 'leaf', 'seed', 'bear', 'wolf', 'eagle', 'lion',
-    'tiger', 'shark', 'whale', 'rose', 'oak', 'pine', 'river', 'mountain', 'valley', 'ocean'
+    'tiger', 'shark', 'whale', 'rose', 'oak', 'pine', 'river', 'mountain', 'valley', 'ocean',
+    'cloud', 'stone'
 ]
 
 VERBS = [
     'runs', 'jumps', 'flies', 'swims', 'dances', 'sings', 'walks', 'climbs', 'rolls', 'spins',
     'glows', 'shines', 'burns', 'flows', 'grows', 'moves', 'plays', 'works', 'builds', 'creates',
-    'thinks', 'dreams', 'hopes', 'wins', 'leads', 'helps', 'saves', 'finds', 'makes', 'gives'
+    'thinks', 'dreams', 'hopes', 'wins', 'leads', 'helps', 'saves', 'finds', 'makes', 'gives',
+    'rises', 'waits'
 ]
 
+# Each list holds 32 words, so indexes come from 5-bit masks of the hash
+_ADJ_MASK = len(ADJECTIVES) - 1
+_NOUN_MASK = len(NOUNS) - 1
+_VERB_MASK = len(VERBS) - 1
+
 def generate_mnemonic_trade_id(scrape_date, strategy_type, tab_name, ticker, trigger_price, strike_price):
     """
     Generate a human-readable 3-word mnemonic trade ID
     Uses hash of input data to ensure deterministic results
     """
     # Create the same combined string as before
-    components = [
+    # (joined as text and encoded once rather than per component)
+    combined_bytes = '|'.join([
         str(scrape_date) if scrape_date is not None else '',
         str(strategy_type) if strategy_type is not None else '',
         str(tab_name) if tab_name is not None else '',
         str(ticker) if ticker is not None else '',
         str(trigger_price) if trigger_price is not None else '',
         str(strike_price) if strike_price is not None else ''
-    ]
-    combined_string = '|'.join(components)
+    ]).encode('utf-8')
     
+    return _mnemonic_from_bytes(combined_bytes)
+
+@lru_cache(maxsize=131072)
+def _mnemonic_from_bytes(combined_bytes):
+    """
+    Hash the combined input and pick the words; cached because scrape runs
+    keep producing the same strategy rows
+    """
     # Generate hash and use it as seed for reproducible "randomness"
-    hash_value = hashlib.sha256(combined_string.encode('utf-8')).hexdigest()
+    return _mnemonic_from_digest(hashlib.sha256(combined_bytes).digest())
+
+def _mnemonic_from_digest(digest, _A=ADJECTIVES, _N=NOUNS, _V=VERBS):
+    """Pick the three words from a SHA-256 digest"""
+    hash_value = digest.hex()
     
     # Use parts of hash to select words deterministically
-    hash_int = int(hash_value[:16], 16)  # Use first 16 chars of hash as big integer
+    hash_int = int.from_bytes(digest[:8], 'big')  # Use first 8 bytes of hash as big integer
     
     # Use different parts of the hash for each word selection
-    adj_index = (hash_int >> 0) % len(ADJECTIVES)
-    noun_index = (hash_int >> 8) % len(NOUNS) 
-    verb_index = (hash_int >> 16) % len(VERBS)
+    adj_index = hash_int & _ADJ_MASK
+    noun_index = (hash_int >> 5) & _NOUN_MASK
+    verb_index = (hash_int >> 10) & _VERB_MASK
     
-    mnemonic = f"{ADJECTIVES[adj_index]}-{NOUNS[noun_index]}-{VERBS[verb_index]}"
+    mnemonic = f"{_A[adj_index]}-{_N[noun_index]}-{_V[verb_index]}"
     
     return mnemonic, hash_value
 
+def make_mnemonic_generator(scrape_date, strategy_type, tab_name):
+    """
+    Return gen(ticker, trigger_price, strike_price) for a batch of rows that
+    share the three leading fields; results match generate_mnemonic_trade_id
+    The shared prefix is hashed once and each row continues from a copy
+    """
+    prefix = '|'.join([
+        str(scrape_date) if scrape_date is not None else '',
+        str(strategy_type) if strategy_type is not None else '',
+        str(tab_name) if tab_name is not None else '',
+        ''
+    ]).encode('utf-8')
+    base = hashlib.sha256(prefix)
+    
+    def gen(ticker, trigger_price, strike_price):
+        h = base.copy()
+        h.update('|'.join([
+            str(ticker) if ticker is not None else '',
+            str(trigger_price) if trigger_price is not None else '',
+            str(strike_price) if strike_price is not None else ''
+        ]).encode('utf-8'))
+        return _mnemonic_from_digest(h.digest())
+    
+    return gen
+
+MNEMONIC_COLUMNS = ['scrape_date', 'strategy_type', 'tab_name', 'ticker', 'trigger_price', 'strike_price']
+
+def generate_mnemonic_trade_ids_df(df):
+    """
+    Generate mnemonic trade IDs for every row of a DataFrame with the six
+    MNEMONIC_COLUMNS, matching generate_mnemonic_trade_id row for row
+    Each value is formatted exactly as the per-row function does (None -> '',
+    anything else str()), so the frame must hold the original values. Build
+    it with dtype=object when a numeric column can be missing: pandas would
+    otherwise upcast it to float, turning 150 into 150.0 and None into NaN
+    """
+    if df.empty:
+        return pd.Series(index=df.index, dtype=object)
+    
+    combined = ['|'.join(['' if value is None else str(value) for value in row])
+                for row in df[MNEMONIC_COLUMNS].to_numpy(dtype=object)]
+    
+    # Only the first 8 bytes of each digest are used, read as big-endian uint64
+    sha256 = hashlib.sha256
+    digests = b''.join([sha256(s.encode('utf-8')).digest()[:8] for s in combined])
+    hash_ints = np.frombuffer(digests, dtype='>u8')
+    
+    adjectives = np.array(ADJECTIVES)[hash_ints & _ADJ_MASK]
+    nouns = np.array(NOUNS)[(hash_ints >> 5) & _NOUN_MASK]
+    verbs = np.array(VERBS)[(hash_ints >> 10) & _VERB_MASK]
+    
+    mnemonics = np.char.add(np.char.add(np.char.add(np.char.add(adjectives, '-'), nouns), '-'), verbs)
+    return pd.Series(mnemonics, index=df.index, dtype=object)
+
 # Test with sample data
 test_cases = [
     {
@@ -113,4 +190,35 @@ mnemonic2, _ = generate_mnemonic_trade_id(
 )
 print(f"First call:  {mnemonic1}")
 print(f"Second call: {mnemonic2}")
-print(f"Consistent: {mnemonic1 == mnemonic2}")
\ No newline at end of file
+print(f"Consistent: {mnemonic1 == mnemonic2}")
+
+# Batch generation should agree with the per-row function
+print()
+print("Batch Test:")
+print("-" * 30)
+batch_ids = generate_mnemonic_trade_ids_df(pd.DataFrame(test_cases))
+row_ids = [generate_mnemonic_trade_id(*(data[col] for col in MNEMONIC_COLUMNS))[0] for data in test_cases]
+print(f"Batch IDs:  {list(batch_ids)}")
+print(f"Matches per-row: {list(batch_ids) == row_ids}")
+
+# Numeric fields, one of them missing; dtype=object keeps 150 from becoming 150.0
+numeric_cases = [
+    dict(test_cases[2], trigger_price=150, strike_price=155),
+    dict(test_cases[2], trigger_price=None, strike_price=300),
+]
+numeric_batch_ids = generate_mnemonic_trade_ids_df(pd.DataFrame(numeric_cases, dtype=object))
+numeric_row_ids = [generate_mnemonic_trade_id(*(data[col] for col in MNEMONIC_COLUMNS))[0] for data in numeric_cases]
+print(f"Numeric batch IDs: {list(numeric_batch_ids)}")
+print(f"Numeric matches per-row: {list(numeric_batch_ids) == numeric_row_ids}")
+
+# Rows sharing scrape date, strategy and tab reuse one prefix hash
+print()
+print("Shared Prefix Test:")
+print("-" * 30)
+prefix_fields = ['scrape_date', 'strategy_type', 'tab_name']
+prefix_ids = []
+for prefix, group in pd.DataFrame(test_cases).groupby(prefix_fields, sort=False):
+    gen = make_mnemonic_generator(*prefix)
+    prefix_ids.extend(gen(row.ticker, row.trigger_price, row.strike_price)[0] for row in group.itertuples())
+print(f"Prefix IDs: {prefix_ids}")
+print(f"Matches per-row: {sorted(prefix_ids) == sorted(row_ids)}")